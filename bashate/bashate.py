@@ -13,10 +13,9 @@
 # under the License.
 
 import argparse
-import fileinput
+import concurrent.futures
 import os
 import re
-import shlex
 import subprocess
 import sys
 
@@ -25,40 +24,98 @@ from bashate import messages
 
 MESSAGES = messages.MESSAGES
 
+# Patterns are compiled once at import; the checks below run for
+# every line of every file, so avoid the re module's cache lookup on
+# each call.
+_FOR_PAREN_RE = re.compile(r'for \([^\(]')
+_SEMI_DO_RE = re.compile(r';\s*do$')
+_SEMI_THEN_RE = re.compile(r';\s*then$')
+_CMD_ARG_RE = re.compile(
+    r'^(?P<indent>[ \t]+)?(?P<cmd>\S+)(?P<ws>\s+)(?P<arg>\S+)')
+_FUNC_DECL_RE = re.compile(r'^function [\w-]* \{$')
+_FUNC_NO_KEYWORD_RE = re.compile(r'^\s*?\(\)\s*?\{')
+_HEREDOC_RE = re.compile(r"[^<]<<\s*([\'\"]?)(?P<token>\w+)([\'\"]?)")
+_BASH_ERR_RE = re.compile(
+    r'^(?P<file>.*): line (?P<lineno>[0-9]+): (?P<error>.*)')
+_BASH_HEREDOC_START_RE = re.compile(r'^.*line (?P<start>[0-9]+).*$')
+
+# We parse the error messages from "bash -n", so force it to ignore the
+# system locale so we don't get messages in another language.  This is
+# a copy; our own environment is left alone.
+_BASH_ENV = dict(os.environ, LC_ALL='C')
+
+# A number of checks only apply to lines starting with a particular
+# keyword, and no line can start with more than one of them.  Rather
+# than have every one of those checks scan every line, match them all
+# in one pass and dispatch on the group that matched (see
+# _LEADING_CHECKS below).
+_LEADING_CHECK_RE = re.compile(
+    r'(?P<for_do>\s*(?:for|while|until)\s)|'
+    r'(?P<if_then>\s*(?:el)?if \[)|'
+    r'(?P<function_decl>function|\s*?\(\)\s*?\{)|'
+    r'(?P<local_subshell>\s*local )|'
+    r'(?P<bare_arithmetic>\s*\(\()')
+
+# Tokenizer for check_conditional_expression.  This splits a line the
+# same way shlex.shlex in non-POSIX mode does with wordchars set to
+# "[]=~" (which is what we used to use), but without shlex's
+# per-character Python overhead.  In order: comments, quoted strings,
+# words of "[]=~" (quotes are allowed inside a word once it has
+# started) and any other single character.  A lone quote character is
+# an unterminated string.
+_COND_TOKEN_RE = re.compile(
+    r'#.*|"[^"]*"|\'[^\']*\'|[\[\]=~][\[\]=~"\']*|[^ \t\r\n]')
+
 
 def is_continuation(line):
-    return re.search(r'\\\s*$', line)
+    return line.rstrip().endswith('\\')
 
 
 def check_for_do(line, report):
+    # cheap substring tests first; most lines contain none of these
+    if 'for' not in line and 'while' not in line and 'until' not in line:
+        return
     if not is_continuation(line):
-        match = re.match(r'^\s*(for|while|until)\s', line)
-        if match:
-            operator = match.group(1).strip()
-            if operator == "for":
-                # "for i in ..." and "for ((" is bash, but
-                # "for (" is likely from an embedded awk script,
-                # so skip it
-                if re.search(r'for \([^\(]', line):
-                    return
-            if not re.search(r';\s*do$', line):
-                report.print_error((MESSAGES['E010'].msg % operator), line)
+        stripped = line.lstrip()
+        for operator in ('for', 'while', 'until'):
+            # the keyword must be followed by whitespace
+            if (stripped.startswith(operator) and
+                    stripped[len(operator):len(operator) + 1].isspace()):
+                break
+        else:
+            return
+        if operator == "for":
+            # "for i in ..." and "for ((" is bash, but
+            # "for (" is likely from an embedded awk script,
+            # so skip it
+            if _FOR_PAREN_RE.search(line):
+                return
+        if not _SEMI_DO_RE.search(line):
+            report.print_error((MESSAGES['E010'].msg % operator), line)
 
 
 def check_if_then(line, report):
+    if 'if [' not in line:
+        return
     if not is_continuation(line):
-        if re.search(r'^\s*(el)?if \[', line):
-            if not re.search(r';\s*then$', line):
+        if line.lstrip().startswith(('if [', 'elif [')):
+            if not _SEMI_THEN_RE.search(line):
                 report.print_error(MESSAGES['E011'].msg, line)
 
 
 def check_no_trailing_whitespace(line, report):
-    if re.search(r'[ \t]+$', line):
+    # a plain string test is much cheaper than the regex engine for
+    # something this simple, and this runs on every line
+    stripped = line.rstrip('\n')
+    if stripped and stripped[-1] in ' \t':
         report.print_error(MESSAGES['E001'].msg, line)
 
 
 def check_no_long_lines(line, report, max_line_length):
-    if len(line.rstrip("\r\n")) > max_line_length:
+    # most lines are short enough even with their newline; only copy
+    # the line to strip it when it might be too long
+    if (len(line) > max_line_length and
+            len(line.rstrip("\r\n")) > max_line_length):
         report.print_error(MESSAGES['E006'].msg, line)
 
 
@@ -72,44 +129,42 @@ def check_indents(logical_line, report):
 
     # Find the offset of the first argument of the command (if it has
     # one)
-    m = re.search(r'^(?P<indent>[ \t]+)?(?P<cmd>\S+)(?P<ws>\s+)(?P<arg>\S+)',
-                  logical_line[0])
+    m = _CMD_ARG_RE.search(logical_line[0])
     arg_offset = None
     if m:
         arg_offset = len(m.group('indent')) if m.group('indent') else 0
         arg_offset += len(m.group('cmd')) + len(m.group('ws'))
 
-    # go through each line
+    # go through each line; the first line and lines without an
+    # argument should be offset by 4 spaces
     for lineno, line in enumerate(logical_line):
-        m = re.search(r'^(?P<indent>[ \t]+)', line)
-        if m:
-            # no tabs, only spaces
-            if re.search(r'\t', m.group('indent')):
-                report.print_error(MESSAGES['E002'].msg, line)
+        check_indent(line, report, arg_offset if lineno else None)
 
-            offset = len(m.group('indent'))
 
-            # the first line and lines without an argument should be
-            # offset by 4 spaces
-            if (lineno == 0) or (arg_offset is None):
-                if (offset % 4) != 0:
-                    report.print_error(MESSAGES['E003'].msg, line)
-            else:
-                # other lines are allowed to line up with the first
-                # argument, or be multiple-of 4 spaces
-                if offset != arg_offset and (offset % 4) != 0:
-                    report.print_error(MESSAGES['E003'].msg, line)
+def check_indent(line, report, arg_offset=None):
+    # check the indent of a single line.  If arg_offset is given (see
+    # check_indents), the line may also line up with that instead
+    offset = len(line) - len(line.lstrip(' \t'))
+    if offset:
+        # no tabs, only spaces
+        if '\t' in line[:offset]:
+            report.print_error(MESSAGES['E002'].msg, line)
+
+        if offset != arg_offset and (offset % 4) != 0:
+            report.print_error(MESSAGES['E003'].msg, line)
 
 
 def check_function_decl(line, report):
+    if 'function' not in line and '()' not in line:
+        return
     failed = False
     if line.startswith("function"):
-        if not re.search(r'^function [\w-]* \{$', line):
+        if not _FUNC_DECL_RE.search(line):
             failed = True
     else:
         # catch the case without "function", e.g.
         # things like '^foo() {'
-        if re.search(r'^\s*?\(\)\s*?\{', line):
+        if _FUNC_NO_KEYWORD_RE.search(line):
             failed = True
 
     if failed:
@@ -119,12 +174,16 @@ def check_function_decl(line, report):
 def starts_heredoc(line):
     # note, watch out for <<EOF and <<'EOF' ; quotes in the
     # deliminator are part of syntax
-    m = re.search(r"[^<]<<\s*([\'\"]?)(?P<token>\w+)([\'\"]?)", line)
+    if '<<' not in line:
+        return False
+    m = _HEREDOC_RE.search(line)
     return m.group('token') if m else False
 
 
 def end_of_heredoc(line, token):
-    return token and re.search(r"^%s\s*$" % token, line)
+    # the terminator must be alone on its line; only trailing
+    # whitespace is allowed after it
+    return token and line.rstrip() == token
 
 
 def check_arithmetic(line, report):
@@ -164,24 +223,29 @@ def check_conditional_expression(line, report):
     # > if [ $foo =~ "bar" ]; then
     # type statements, which are the vast majority of typo errors.
     #
-    # shlex is pretty helpful in getting us something we can walk to
-    # find this pattern.  It does however have issues with
+    # Splitting the line into shell-ish tokens gives us something we
+    # can walk to find this pattern.  It does however have issues with
     # unterminated quotes on multi-line strings (e.g.)
     #
     # foo="bar   <-- we only see this bit in "line"
     #  baz"
     #
-    # So we're just going to ignore parser failures here and move on.
+    # So we're just going to ignore such lines here and move on.
     # Possibly in the future we could pull such multi-line strings
-    # into "logical_line" below, and pass that here and have shlex
-    # break that up.
-    try:
-        toks = shlex.shlex(line)
-        toks.wordchars = "[]=~"
-        toks = list(toks)
-    except ValueError:
+    # into "logical_line" below, and pass that here and break that up.
+    #
+    # Don't bother unless there is a single bracket to find.
+    if '[' not in line:
         return
 
+    toks = []
+    for tok in _COND_TOKEN_RE.findall(line):
+        if tok[0] == '#':
+            break
+        if tok in ('"', "'"):
+            return
+        toks.append(tok)
+
     in_single_bracket = False
     for tok in toks:
         if tok == '[':
@@ -192,9 +256,22 @@ def check_conditional_expression(line, report):
             in_single_bracket = False
 
 
-def check_syntax(filename, report):
+def start_syntax_check(filename):
     # run the file through "bash -n" to catch basic syntax errors and
-    # other warnings
+    # other warnings.  This only starts bash; check_syntax collects
+    # and reports the results, so callers can get on with other work
+    # in the meantime.
+    return subprocess.Popen(
+        ['bash', '-n', filename], stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, env=_BASH_ENV,
+        universal_newlines=True)
+
+
+def check_syntax(filename, report, proc=None):
+    # proc is a check already started with start_syntax_check
+    if proc is None:
+        proc = start_syntax_check(filename)
+    outputs = proc.communicate()
     matches = []
 
     # sample lines we want to match:
@@ -205,20 +282,8 @@ def check_syntax(filename, report):
     #
     # i.e. consistency with ":"'s isn't constant, so just do our
     # best...
-    r = re.compile(
-        '^(?P<file>.*): line (?P<lineno>[0-9]+): (?P<error>.*)')
-    # we are parsing the error message, so force it to ignore the
-    # system locale so we don't get messages in another language
-    bash_environment = os.environ
-    bash_environment['LC_ALL'] = 'C'
-    proc = subprocess.Popen(
-        ['bash', '-n', filename], stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE, env=bash_environment,
-        universal_newlines=True)
-    outputs = proc.communicate()
-
     for line in outputs[1].split('\n'):
-        m = r.match(line)
+        m = _BASH_ERR_RE.match(line)
         if m:
             matches.append(m)
 
@@ -236,14 +301,69 @@ def check_syntax(filename, report):
         # catch.
         if 'warning:' in m.group('error'):
             if 'delimited by end-of-file' in m.group('error'):
-                start = re.match('^.*line (?P<start>[0-9]+).*$',
-                                 m.group('error'))
+                start = _BASH_HEREDOC_START_RE.match(m.group('error'))
                 report.print_error(
                     MESSAGES['E012'].msg % int(start.group('start')),
                     filename=filename,
                     filelineno=int(m.group('lineno')))
 
 
+def _check_file_in_worker(args):
+    # Runs BashateRun.check_file in a worker process (see
+    # BashateRun.check_files), collecting whatever it reports rather
+    # than printing it so the parent can replay it in order.  Each
+    # entry is the name of the BashateRun method to call and its args.
+    run, fname, verbose, max_line_length = args
+    reported = []
+
+    def print_error(error, line='', filename=None, filelineno=None):
+        reported.append(('print_error',
+                         (error, line, filename or run.filename,
+                          filelineno or run.filelineno)))
+
+    def log_checking(fname):
+        reported.append(('log_checking', (fname,)))
+
+    run.print_error = print_error
+    run.log_checking = log_checking
+    last_line = run.check_file(fname, verbose, max_line_length)
+    return reported, last_line, run.filelineno
+
+
+# group name in _LEADING_CHECK_RE -> (error code, check)
+_LEADING_CHECKS = {
+    'for_do': ('E010', check_for_do),
+    'if_then': ('E011', check_if_then),
+    'function_decl': ('E020', check_function_decl),
+    'local_subshell': ('E042', check_local_subshell),
+    'bare_arithmetic': ('E043', check_bare_arithmetic),
+}
+
+# These have always run after check_arithmetic, so keep reporting
+# their errors after E041 on the same line.
+_LATE_LEADING_CHECKS = frozenset(('local_subshell', 'bare_arithmetic'))
+
+
+def _parse_rules(rules):
+    # Rules are regular expressions separated by ",", e.g.
+    # "E001,E00[23]", matched against the start of each message.  They
+    # are joined into one pattern and compiled once here.
+    return re.compile('^(' + '|'.join(rules.split(',')) + ')')
+
+
+_PLAIN_RULES_RE = re.compile(r'^[\w,|]*$')
+
+
+def _plain_rules(rules):
+    # When the rules are nothing but (partial) error codes, e.g.
+    # "E001,E00|E011", each one is a literal prefix of every message it
+    # matches, so we can tell up front which checks are ignored
+    # outright.  Anything fancier is only matched against messages.
+    if _PLAIN_RULES_RE.match(rules):
+        return tuple(rules.replace('|', ',').split(','))
+    return ()
+
+
 class BashateRun(object):
 
     def __init__(self):
@@ -252,41 +372,70 @@ class BashateRun(object):
         self.ignore_list = None
         self.warning_count = 0
         self.warning_list = None
+        # position of the line currently being checked; used when
+        # errors are reported without an explicit location
+        self.filename = None
+        self.filelineno = None
+        # error message -> (ignore, warn), see print_error
+        self._verdicts = {}
+        # error code prefixes known to be ignored, see is_enabled
+        self._ignored_codes = ()
 
     def register_ignores(self, ignores):
         if ignores:
-            self.ignore_list = '^(' + '|'.join(ignores.split(',')) + ')'
+            self.ignore_list = _parse_rules(ignores)
+            self._ignored_codes = _plain_rules(ignores)
+            self._verdicts.clear()
 
     def register_warnings(self, warnings):
         if warnings:
-            self.warning_list = '^(' + '|'.join(warnings.split(',')) + ')'
+            self.warning_list = _parse_rules(warnings)
+            self._verdicts.clear()
 
     def register_errors(self, errors):
         if errors:
-            self.error_list = '^(' + '|'.join(errors.split(',')) + ')'
+            self.error_list = _parse_rules(errors)
+            self._verdicts.clear()
 
     def should_ignore(self, error):
-        return self.ignore_list and re.search(self.ignore_list, error)
+        return self.ignore_list and self.ignore_list.match(error)
+
+    def is_enabled(self, code):
+        # If every message with this code is going to be ignored, a
+        # check that can only report it need not run at all.  Other
+        # rules are still applied by print_error.
+        return not code.startswith(self._ignored_codes)
+
+    def wants_syntax_check(self):
+        return self.is_enabled('E040') or self.is_enabled('E012')
 
     def should_warn(self, error):
         # if in the errors list, overrides warning level
-        if self.error_list and re.search(self.error_list, error):
+        if self.error_list and self.error_list.match(error):
             return False
         if messages.is_default_warning(error):
             return True
-        return self.warning_list and re.search(self.warning_list, error)
+        return self.warning_list and self.warning_list.match(error)
 
     def print_error(self, error, line='',
                     filename=None, filelineno=None):
-        if self.should_ignore(error):
+        # The same handful of messages are reported over and over, so
+        # remember how each one is handled rather than matching it
+        # against the ignore/warn/error lists every time.
+        verdict = self._verdicts.get(error)
+        if verdict is None:
+            ignore = bool(self.should_ignore(error))
+            warn = not ignore and bool(self.should_warn(error))
+            verdict = self._verdicts[error] = (ignore, warn)
+        ignore, warn = verdict
+
+        if ignore:
             return
 
-        warn = self.should_warn(error)
-
         if not filename:
-            filename = fileinput.filename()
+            filename = self.filename
         if not filelineno:
-            filelineno = fileinput.filelineno()
+            filelineno = self.filelineno
         if warn:
             self.warning_count = self.warning_count + 1
         else:
@@ -297,99 +446,214 @@ class BashateRun(object):
     def log_error(self, error, line, filename, filelineno, warn=False):
         # following pycodestyle/pep8 default output format
         # https://github.com/PyCQA/pycodestyle/blob/master/pycodestyle.py#L108
-        print("%(filename)s:%(filelineno)s:1: %(error)s" %
-              {'filename': filename,
-               'filelineno': filelineno,
-               'error': error.replace(":", "", 1)})
+        sys.stdout.write("%s:%s:1: %s\n" %
+                         (filename, filelineno, error.replace(":", "", 1)))
+
+    def log_checking(self, fname):
+        print("Running bashate on %s" % fname)
+
+    def check_files(self, files, verbose, max_line_length=79, jobs=1):
+        line = None
+        if jobs > 1 and len(files) > 1:
+            line = self._check_files_parallel(files, verbose,
+                                              max_line_length, jobs)
+        else:
+            # "bash -n" for the next file runs while we check the
+            # current one, rather than everything waiting on it
+            next_syntax_check = None
+            syntax_checks = self.wants_syntax_check()
+            try:
+                for i, fname in enumerate(files):
+                    syntax_check = next_syntax_check
+                    if syntax_check is None and syntax_checks:
+                        syntax_check = start_syntax_check(fname)
+                    next_syntax_check = None
+                    if i + 1 < len(files) and syntax_checks:
+                        next_syntax_check = start_syntax_check(files[i + 1])
+                    last_line = self.check_file(fname, verbose,
+                                                max_line_length,
+                                                syntax_check)
+                    if last_line is not None:
+                        line = last_line
+            finally:
+                if next_syntax_check is not None:
+                    next_syntax_check.communicate()
+
+        # finished processing the files
 
-    def check_files(self, files, verbose, max_line_length=79):
+        # last line should always end with a newline
+        if line is not None and not line.endswith('\n'):
+            self.print_error(MESSAGES['E004'].msg, line)
+
+    def _check_files_parallel(self, files, verbose, max_line_length, jobs):
+        # Files are checked independently in worker processes, which
+        # hand back everything they would have reported.  Replaying
+        # that here, in the original file order, keeps counting and
+        # output exactly as if the files were checked one by one.
+        line = None
+        work = [(self, fname, verbose, max_line_length) for fname in files]
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            results = executor.map(_check_file_in_worker, work)
+            for fname, (reported, last_line, filelineno) in zip(files,
+                                                                results):
+                for method, args in reported:
+                    getattr(self, method)(*args)
+                self.filename = fname
+                self.filelineno = filelineno
+                if last_line is not None:
+                    line = last_line
+        return line
+
+    def check_file(self, fname, verbose, max_line_length=79,
+                   syntax_check=None):
+        """Check a single file
+
+        :param syntax_check: a "bash -n" run of the file already
+                             started with start_syntax_check
+        :return: the last line of the file, or None if it is empty
+        """
         logical_line = ""
         token = False
+        line = None
 
         # NOTE(mrodden): magic; replace with proper
         # report class when necessary
         report = self
 
-        for fname in files:
-
-            # reset world
-            in_heredoc = False
-            in_continuation = False
-
-            # simple syntax checking, as files can pass style but still cause
-            # syntax errors when you try to run them.
-            check_syntax(fname, report)
-
-            for line in fileinput.input(fname):
-                if fileinput.isfirstline():
-
-                    check_hashbang(line, fileinput.filename(), report)
-
-                    if verbose:
-                        print("Running bashate on %s" % fileinput.filename())
+        # reset world
+        in_heredoc = False
+        in_continuation = False
+
+        # simple syntax checking, as files can pass style but still cause
+        # syntax errors when you try to run them.
+        if syntax_check is not None or self.wants_syntax_check():
+            check_syntax(fname, report, syntax_check)
+
+        with open(fname) as f:
+            file_lines = f.readlines()
+        self.filename = fname
+        self.filelineno = 0
+
+        # Some checks look for things most files don't contain at
+        # all.  One scan of the whole file is much cheaper than
+        # testing each line for them, and lets us skip those
+        # checks entirely for clean files.
+        # Checks for ignored errors are left out altogether.
+        text = ''.join(file_lines)
+        any_trailing_ws = self.is_enabled('E001') and (
+            ' \n' in text or '\t\n' in text or
+            text.endswith((' ', '\t')))
+        any_arithmetic = self.is_enabled('E041') and '$[' in text
+        long_lines = self.is_enabled('E006')
+        conditionals = self.is_enabled('E044')
+
+        # bound once here rather than looked up for every line
+        match_leading_check = _LEADING_CHECK_RE.match
+        leading_checks = dict((group, check) for group, (code, check)
+                              in _LEADING_CHECKS.items()
+                              if self.is_enabled(code))
+
+        def check_line(line):
+            # the checks run on each physical line outside a heredoc
+            if any_trailing_ws:
+                check_no_trailing_whitespace(line, report)
+            if long_lines:
+                check_no_long_lines(line, report, max_line_length)
+            check = late_check = None
+            if leading_checks:
+                m = match_leading_check(line)
+                if m:
+                    check = leading_checks.get(m.lastgroup)
+                    if m.lastgroup in _LATE_LEADING_CHECKS:
+                        late_check, check = check, None
+            if check is not None:
+                check(line, report)
+            if any_arithmetic:
+                check_arithmetic(line, report)
+            if late_check is not None:
+                late_check(line, report)
+            if conditionals:
+                check_conditional_expression(line, report)
+
+        for lineno, line in enumerate(file_lines, 1):
+            self.filelineno = lineno
+            if lineno == 1:
+
+                check_hashbang(line, fname, report)
+
+                if verbose:
+                    self.log_checking(fname)
+
+            # An empty line can't fail any check, but it still ends a
+            # continuation or belongs to a heredoc.  Lines holding
+            # only whitespace go through the checks as usual.
+            if line == '\n' and not (in_heredoc or in_continuation):
+                continue
+
+            # Don't run any tests on comment lines (but remember
+            # inside a heredoc this might be part of the syntax of
+            # an embedded script, just ignore that)
+            if line.lstrip().startswith('#') and not in_heredoc:
+                check_indent(line, report)
+                # a comment inside a continuation starts it over; the
+                # lines after it are checked along with the comment
+                if in_continuation:
+                    logical_line = [line]
+                continue
+
+            # Strip trailing comments. From bash:
+            #
+            #   a word beginning with # causes that word and all
+            #   remaining characters on that line to be ignored.
+            #   ...
+            #   A character that, when unquoted, separates
+            #   words. One of the following: | & ; ( ) < > space
+            #   tab
+            #
+            # for simplicity, we strip inline comments by
+            # matching just '<space>#'.
+            if not in_heredoc:
+                ll_split = line.split(' #', 1)
+                if len(ll_split) > 1:
+                    line = ll_split[0].rstrip()
+
+            # see if this starts a heredoc
+            if not in_heredoc:
+                token = starts_heredoc(line)
+                if token:
+                    in_heredoc = True
+                    logical_line = [line]
+                    continue
 
-                # Don't run any tests on comment lines (but remember
-                # inside a heredoc this might be part of the syntax of
-                # an embedded script, just ignore that)
-                if line.lstrip().startswith('#') and not in_heredoc:
+            # see if this starts a continuation
+            if not in_continuation:
+                if is_continuation(line):
+                    in_continuation = True
                     logical_line = [line]
-                    check_indents(logical_line, report)
                     continue
 
-                # Strip trailing comments. From bash:
-                #
-                #   a word beginning with # causes that word and all
-                #   remaining characters on that line to be ignored.
-                #   ...
-                #   A character that, when unquoted, separates
-                #   words. One of the following: | & ; ( ) < > space
-                #   tab
-                #
-                # for simplicity, we strip inline comments by
-                # matching just '<space>#'.
-                if not in_heredoc:
-                    ll_split = line.split(' #', 1)
-                    if len(ll_split) > 1:
-                        line = ll_split[0].rstrip()
-
-                # see if this starts a heredoc
-                if not in_heredoc:
-                    token = starts_heredoc(line)
-                    if token:
-                        in_heredoc = True
-                        logical_line = [line]
-                        continue
-
-                # see if this starts a continuation
-                if not in_continuation:
-                    if is_continuation(line):
-                        in_continuation = True
-                        logical_line = [line]
-                        continue
-
-                # if we are in a heredoc or continuation, just loop
-                # back and keep buffering the lines into
-                # "logical_line" until the end of the
-                # heredoc/continuation.
-                if in_heredoc:
+            # if we are in a heredoc or continuation, just loop
+            # back and keep buffering the lines into
+            # "logical_line" until the end of the
+            # heredoc/continuation.
+            if in_heredoc:
+                # FIXME: if we want to do something with heredocs
+                # in the future, they will need buffering too.  For
+                # now they are skipped, so there's no point keeping
+                # the lines, except when the heredoc was started on a
+                # continued line; then they are checked along with
+                # the rest of the continuation once it ends.
+                if in_continuation:
                     logical_line.append(line)
-                    if not end_of_heredoc(line, token):
-                        continue
-                    else:
-                        in_heredoc = False
-                        # FIXME: if we want to do something with
-                        # heredocs in the future, then the whole thing
-                        # is now stored in logical_line.  for now,
-                        # skip
-                        continue
-                elif in_continuation:
-                    logical_line.append(line)
-                    if is_continuation(line):
-                        continue
-                    else:
-                        in_continuation = False
+                if end_of_heredoc(line, token):
+                    in_heredoc = False
+                continue
+            elif in_continuation:
+                logical_line.append(line)
+                if is_continuation(line):
+                    continue
                 else:
-                    logical_line = [line]
+                    in_continuation = False
 
                 check_indents(logical_line, report)
 
@@ -397,22 +661,15 @@ class BashateRun(object):
                 # the whole continuation.  XXX : historically, we've
                 # just handled every line in a continuation
                 # separatley.  Stick with what works...
-                for line in logical_line:
-                    check_no_trailing_whitespace(line, report)
-                    check_no_long_lines(line, report, max_line_length)
-                    check_for_do(line, report)
-                    check_if_then(line, report)
-                    check_function_decl(line, report)
-                    check_arithmetic(line, report)
-                    check_local_subshell(line, report)
-                    check_bare_arithmetic(line, report)
-                    check_conditional_expression(line, report)
-
-        # finished processing the file
+                for physical_line in logical_line:
+                    check_line(physical_line)
+            else:
+                # the common case of a line on its own; no need to
+                # build up a logical_line
+                check_indent(line, report)
+                check_line(line)
 
-        # last line should always end with a newline
-        if not line.endswith('\n'):
-            report.print_error(MESSAGES['E004'].msg, line)
+        return line
 
 
 def main(args=None):
@@ -432,6 +689,8 @@ def main(args=None):
     parser.add_argument('--max-line-length', default=79, type=int,
                         help='Max line length')
     parser.add_argument('-v', '--verbose', action='store_true', default=False)
+    parser.add_argument('-j', '--jobs', default=1, type=int,
+                        help='Number of files to check in parallel')
     parser.add_argument('--version', action='store_true',
                         help='show bashate version number and exit',
                         default=False)
@@ -457,7 +716,8 @@ def main(args=None):
     run.register_errors(opts.error)
 
     try:
-        run.check_files(files, opts.verbose, opts.max_line_length)
+        run.check_files(files, opts.verbose, opts.max_line_length,
+                        opts.jobs)
     except IOError as e:
         print("bashate: %s" % e)
         return 1
@@ -10,7 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import re
 import textwrap
 
 
@@ -32,14 +31,18 @@ class _Message(object):
     def __init__(self, msg_id, msg_str, long_msg, default):
         self.msg_id = msg_id
         self.msg_str = msg_str
-        # clean-up from """ to a plain string
-        if long_msg:
-            self.long_msg = textwrap.dedent(long_msg)
-            self.long_msg = self.long_msg.strip()
-        else:
-            self.long_msg = None
+        self._long_msg = long_msg
+        self._long_msg_clean = None
         self.default = default
 
+    @property
+    def long_msg(self):
+        # clean-up from """ to a plain string.  This is only needed
+        # for --show and the docs, so don't pay for it at import.
+        if self._long_msg and self._long_msg_clean is None:
+            self._long_msg_clean = textwrap.dedent(self._long_msg).strip()
+        return self._long_msg_clean
+
     @property
     def msg(self):
         # For historical reasons, the code relies on "id: msg" so build
@@ -210,19 +213,18 @@ for k, v in _messages.items():
     if v['default'] == 'W':
         _default_warnings.append(k)
 
-# convert this to the regex strings.  This looks a bit weird
-# but it fits the current model of error/warning/ignore checking
-# easily.
-_default_errors = '^(' + '|'.join(_default_errors) + ')'
-_default_warnings = '^(' + '|'.join(_default_warnings) + ')'
+# messages always start with their code, e.g. "E001: ...", so the
+# default level is found by looking the code up in these sets
+_default_errors = frozenset(_default_errors)
+_default_warnings = frozenset(_default_warnings)
 
 
 def is_default_error(error):
-    return re.search(_default_errors, error)
+    return error.split(':', 1)[0] in _default_errors
 
 
 def is_default_warning(error):
-    return re.search(_default_warnings, error)
+    return error.split(':', 1)[0] in _default_warnings
 
 
 def print_messages():
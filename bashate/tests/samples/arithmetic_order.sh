@@ -0,0 +1,6 @@
+#!/bin/bash
+
+function foo {
+    local x=$($[1])
+    (( i = $[i + 1] ))
+}
@@ -0,0 +1,5 @@
+#!/bin/bash
+
+echo foo \
+    # comment 
+echo bar
@@ -35,7 +35,7 @@ class TestBashate(base.TestCase):
 
     @mock.patch('bashate.bashate.BashateRun')
     def test_main_no_files(self, m_bashaterun):
-        m_run_obj = mock.MagicMock()
+        m_run_obj = mock.Mock()
         m_run_obj.error_count = 0
         m_run_obj.warning_count = 0
         m_bashaterun.return_value = m_run_obj
@@ -46,7 +46,7 @@ class TestBashate(base.TestCase):
 
     @mock.patch('bashate.bashate.BashateRun')
     def test_main_return_one_on_errors(self, m_bashaterun):
-        m_run_obj = mock.MagicMock()
+        m_run_obj = mock.Mock()
         m_run_obj.warning_count = 1
         m_run_obj.error_count = 1
         m_bashaterun.return_value = m_run_obj
@@ -57,7 +57,7 @@ class TestBashate(base.TestCase):
 
     @mock.patch('bashate.bashate.BashateRun')
     def test_main_return_one_on_ioerror(self, m_bashaterun):
-        m_run_obj = mock.MagicMock()
+        m_run_obj = mock.Mock()
         m_run_obj.error_count = 0
         m_run_obj.check_files = mock.Mock(side_effect=IOError)
         m_bashaterun.return_value = m_run_obj
@@ -67,11 +67,28 @@ class TestBashate(base.TestCase):
         m_run_obj.check_files.assert_called_with(
             ['/path/to/fileA', '/path/to/fileB'],
             True,
-            79
+            79,
+            1
         )
         expected_return = 1
         self.assertEqual(expected_return, result)
 
+    @mock.patch('bashate.bashate.BashateRun')
+    def test_main_jobs(self, m_bashaterun):
+        m_run_obj = mock.Mock()
+        m_run_obj.error_count = 0
+        m_run_obj.warning_count = 0
+        m_bashaterun.return_value = m_run_obj
+
+        result = bashate.main(['-j', '2', '/path/to/fileA', '/path/to/fileB'])
+        m_run_obj.check_files.assert_called_with(
+            ['/path/to/fileA', '/path/to/fileB'],
+            False,
+            79,
+            2
+        )
+        self.assertEqual(0, result)
+
     def test_multi_ignore_with_slash(self):
         self.run.register_ignores('E001|E011')
         bashate.check_no_trailing_whitespace("if ", self.run)
@@ -100,6 +117,13 @@ class TestBashate(base.TestCase):
 
         self.assertEqual(0, self.run.error_count)
 
+    def test_ignore_regex(self):
+        self.run.register_ignores('E00[12]')
+        bashate.check_no_trailing_whitespace("if ", self.run)
+        bashate.check_indent("\t   echo", self.run)
+
+        self.assertEqual(0, self.run.error_count)
+
     @mock.patch('bashate.bashate.BashateRun.print_error')
     def test_while_check_for_do(self, m_print_error):
         test_line = 'while `do something args`'
@@ -108,26 +132,51 @@ class TestBashate(base.TestCase):
         m_print_error.assert_called_once_with(
             MESSAGES['E010'].msg % 'while', test_line)
 
+    @mock.patch('bashate.bashate.BashateRun.print_error')
+    def test_conditional_expression_tokens(self, m_print_error):
+        test_line = 'if [ $foo =~ "bar" ]; then'
+        bashate.check_conditional_expression(test_line, self.run)
+        m_print_error.assert_called_once_with(MESSAGES['E044'].msg,
+                                              test_line)
+
+        # lines we can't tokenize, or where the comparison is commented
+        # out, are skipped
+        m_print_error.reset_mock()
+        bashate.check_conditional_expression('if [ $foo =~ "bar', self.run)
+        bashate.check_conditional_expression('[ ${#foo} > 1 ]', self.run)
+        bashate.check_conditional_expression('[[ $foo =~ "bar" ]]', self.run)
+        m_print_error.assert_not_called()
+
 
 class TestBashateSamples(base.TestCase):
     """End to end regression testing of bashate against script samples."""
 
+    @classmethod
+    def setUpClass(cls):
+        super(TestBashateSamples, cls).setUpClass()
+        # replace log_error once for the whole class with something
+        # that just records what was logged; each test starts with an
+        # empty record (see setUp)
+        cls._orig_log_error = bashate.BashateRun.log_error
+        cls.logged = logged = []
+
+        def log_error(run, error, line, filename, filelineno, warn=False):
+            logged.append((error, filelineno))
+        bashate.BashateRun.log_error = log_error
+
+    @classmethod
+    def tearDownClass(cls):
+        bashate.BashateRun.log_error = cls._orig_log_error
+        super(TestBashateSamples, cls).tearDownClass()
+
     def setUp(self):
         super(TestBashateSamples, self).setUp()
-        log_error_patcher = mock.patch(
-            'bashate.bashate.BashateRun.log_error')
-        self.m_log_error = log_error_patcher.start()
+        del self.logged[:]
         self.run = bashate.BashateRun()
-        self.addCleanup(log_error_patcher.stop)
 
     def assert_error_found(self, error, lineno):
-        error_found = False
-        for call in self.m_log_error.call_args_list:
-            # unwrap args
-            args = call[0]
-            if (args[0].startswith(error) and lineno == args[3]):
-                error_found = True
-        if not error_found:
+        if not any(e.startswith(error) and lineno == line
+                   for e, line in self.logged):
             self.fail('Error %s expected at line %d not found!' %
                       (error, lineno))
 
@@ -137,6 +186,15 @@ class TestBashateSamples(base.TestCase):
 
         self.assert_error_found('E001', 4)
 
+    def test_sample_E001_ignored(self):
+        test_files = ['bashate/tests/samples/E001_bad.sh']
+        for ignores in ('E001', 'E00', 'E00[12]', 'E0.1'):
+            run = bashate.BashateRun()
+            run.register_ignores(ignores)
+            run.check_files(test_files, False)
+
+            self.assertEqual(0, run.error_count, ignores)
+
     def test_sample_E002(self):
         test_files = ['bashate/tests/samples/E002_bad.sh']
         self.run.check_files(test_files, False)
@@ -249,6 +307,15 @@ class TestBashateSamples(base.TestCase):
 
         self.assert_error_found('E043', 6)
 
+    def test_sample_arithmetic_order(self):
+        # E041 is reported before E042/E043 on the same line
+        test_files = ['bashate/tests/samples/arithmetic_order.sh']
+        self.run.check_files(test_files, False)
+
+        self.assertEqual(
+            [('E041', 4), ('E042', 4), ('E041', 5), ('E043', 5)],
+            [(error.split(':')[0], lineno) for error, lineno in self.logged])
+
     def test_sample_for_loops(self):
         test_files = ['bashate/tests/samples/for_loops.sh']
         self.run.check_files(test_files, False)
@@ -265,6 +332,15 @@ class TestBashateSamples(base.TestCase):
         self.assert_error_found('E003', 28)
         self.assertEqual(3, self.run.error_count)
 
+    def test_sample_comments_continuation(self):
+        # a comment inside a continuation starts it over, and is
+        # checked along with the rest of it when it ends
+        test_files = ['bashate/tests/samples/comments_continuation.sh']
+        self.run.check_files(test_files, False)
+
+        self.assert_error_found('E001', 5)
+        self.assertEqual(1, self.run.error_count)
+
     def test_sample_E005(self):
         test_files = ['bashate/tests/samples/E005_bad']
         self.run.register_errors('E005')
@@ -285,6 +361,15 @@ class TestBashateSamples(base.TestCase):
 
         self.assert_error_found('E040', 7)
 
+    @mock.patch('bashate.bashate.start_syntax_check')
+    def test_sample_E040_ignored(self, m_start_syntax_check):
+        test_files = ['bashate/tests/samples/E040_syntax_error.sh']
+        self.run.register_ignores('E040,E012')
+        self.run.check_files(test_files, False)
+
+        m_start_syntax_check.assert_not_called()
+        self.assertEqual(0, self.run.error_count)
+
     def test_sample_E044(self):
         test_files = ['bashate/tests/samples/E044_bad.sh']
         self.run.check_files(test_files, False)
@@ -307,6 +392,39 @@ class TestBashateSamples(base.TestCase):
         self.assertEqual(0, self.run.error_count)
         self.assertEqual(4, self.run.warning_count)
 
+    def test_sample_parallel(self):
+        test_files = ['bashate/tests/samples/E001_bad.sh',
+                      'bashate/tests/samples/E004_bad.sh']
+        self.run.check_files(test_files, False, jobs=2)
+
+        self.assert_error_found('E001', 4)
+        self.assert_error_found('E004', 3)
+        self.assertEqual(2, self.run.error_count)
+
+    def test_sample_parallel_verbose(self):
+        # each file's syntax errors come before the notice that it is
+        # being checked, in the same order as checking them one by one
+        test_files = ['bashate/tests/samples/E040_syntax_error.sh',
+                      'bashate/tests/samples/E001_bad.sh']
+
+        def log_checking(run, fname):
+            self.logged.append(('checking', fname))
+
+        with mock.patch.object(bashate.BashateRun, 'log_checking',
+                               log_checking):
+            for jobs in (1, 2):
+                del self.logged[:]
+                bashate.BashateRun().check_files(test_files, True,
+                                                 jobs=jobs)
+
+                self.assertEqual(
+                    [('E040', 7),
+                     ('checking', test_files[0]),
+                     ('checking', test_files[1]),
+                     ('E001', 4)],
+                    [(entry[0].split(':')[0], entry[1])
+                     for entry in self.logged])
+
     def test_ignore_heredoc(self):
         test_files = ['bashate/tests/samples/heredoc_ignore.sh']
         self.run.check_files(test_files, False)